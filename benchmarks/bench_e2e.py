@@ -0,0 +1,391 @@
+"""
+bench_e2e.py
+------------
+Offline end-to-end benchmark for the FastAPI app in `main.py`.
+
+The app runs in-process against local stand-ins for Groq, Google News RSS and
+article pages (see `mock_services.py`), using `captions.csv` scaled up to
+simulate longer videos. For every scale, scenario and concurrency level it
+reports end-to-end and per-stage p50/p95/p99 latency, throughput and peak RSS,
+and writes everything to a JSON file that can be compared against a previous run.
+Each scale runs in its own Python process, so its peak RSS is not inflated by
+the scales before it.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_e2e --scales 1,10,100,1000 --concurrency 1,4,16
+    python -m benchmarks.bench_e2e --output new.json --compare old.json
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.mock_services import MockGroqHandler, MockNewsHandler, start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAPTIONS_CSV = os.path.join(REPO_ROOT, "captions.csv")
+
+SEARCH_QUERIES = [
+    "what does the AI assistant respond",
+    "how are large language models trained",
+    "predict the next word",
+    "reinforcement learning with human feedback",
+    "attention and transformers",
+]
+
+# stage name -> list of durations in seconds, filled by the `timed` wrappers.
+STAGE_TIMINGS = defaultdict(list)
+
+
+# -------------------------------
+# Statistics helpers
+# -------------------------------
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def summarize_latencies(values: list) -> dict:
+    """Returns count and p50/p95/p99/mean/max in milliseconds."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "mean_ms": sum(values) / len(values) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# -------------------------------
+# Stage instrumentation
+# -------------------------------
+
+def timed(stage: str, fn):
+    """Wraps a sync or async callable so each call is recorded under `stage`."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                STAGE_TIMINGS[stage].append(time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            STAGE_TIMINGS[stage].append(time.perf_counter() - start)
+    return wrapper
+
+
+def instrument_stages(main_module):
+    """Patches the pipeline entry points that the endpoints call."""
+    from src.Database import faiss_search
+    from src.pipelines.fact_checker import FactChecker
+
+    faiss_search.get_embedding = timed("embedding", faiss_search.get_embedding)
+    faiss_search.search_faiss = timed("faiss_search", faiss_search.search_faiss)
+    main_module.get_context_around_timestamp = timed(
+        "context_lookup", main_module.get_context_around_timestamp
+    )
+    for name in ("refine_context", "fetch_article_links", "fetch_article_content",
+                 "verify_fact", "summarize_text", "extract_claims", "crawl_links"):
+        setattr(FactChecker, name, timed(name, getattr(FactChecker, name)))
+
+
+# -------------------------------
+# Synthetic transcripts
+# -------------------------------
+
+def _to_seconds(ts: str) -> int:
+    h, m, s = map(int, ts.split(":"))
+    return h * 3600 + m * 60 + s
+
+
+def _to_timestamp(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def write_scaled_captions(output_csv: str, scale: int) -> int:
+    """
+    Writes `captions.csv` repeated `scale` times with shifted timestamps,
+    as if the video were `scale` times longer. Returns the number of rows.
+    """
+    with open(CAPTIONS_CSV, newline="", encoding="utf-8") as f:
+        rows = [(_to_seconds(ts), caption) for ts, caption in list(csv.reader(f))[1:]]
+    duration = rows[-1][0] + 5
+
+    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Caption"])
+        for k in range(scale):
+            writer.writerows((_to_timestamp(t + k * duration), c) for t, c in rows)
+    return len(rows) * scale
+
+
+def sample_contexts(count: int) -> list:
+    """Consecutive caption windows used as fact-check inputs."""
+    with open(CAPTIONS_CSV, newline="", encoding="utf-8") as f:
+        captions = [row[1] for row in list(csv.reader(f))[1:]]
+    rng = random.Random(0)
+    contexts = []
+    for _ in range(count):
+        start = rng.randrange(0, max(1, len(captions) - 4))
+        contexts.append(" ".join(captions[start:start + 4]))
+    return contexts
+
+
+# -------------------------------
+# Scenarios
+# -------------------------------
+
+def build_scenarios(requests_per_level: int) -> dict:
+    contexts = sample_contexts(requests_per_level)
+
+    def search(i):
+        return "POST", "/search/", {"search_query": SEARCH_QUERIES[i % len(SEARCH_QUERIES)], "context_window": 10}
+
+    def summarize(i):
+        return "GET", "/summarize/", None
+
+    def fact_check(i):
+        return "POST", "/fact-check/", {"context_text": contexts[i % len(contexts)]}
+
+    def fact_check_batch(i):
+        return "POST", "/fact-check/batch/", {"max_claims": 5, "max_concurrency": 4}
+
+    return {"search": search, "summarize": summarize, "fact_check": fact_check,
+            "fact_check_batch": fact_check_batch}
+
+
+async def run_level(client, make_request, concurrency: int, total: int) -> dict:
+    """Sends `total` requests with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        method, path, body = make_request(i)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    STAGE_TIMINGS.clear()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": total / wall if wall else 0.0,
+        "latency": summarize_latencies(latencies),
+        "stages": {stage: summarize_latencies(v) for stage, v in sorted(STAGE_TIMINGS.items())},
+    }
+
+
+async def run_scale(main_module, scale: int, args) -> dict:
+    import httpx
+    from src.Database import faiss_search
+
+    rows = write_scaled_captions("captions.csv", scale)
+    start = time.perf_counter()
+    faiss_search.create_faiss_index()
+    index_build_s = time.perf_counter() - start
+
+    scenarios = build_scenarios(args.requests)
+    results = {}
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in args.scenarios:
+            results[name] = []
+            for concurrency in args.concurrency:
+                total = max(args.requests, concurrency)
+                level = await run_level(client, scenarios[name], concurrency, total)
+                results[name].append(level)
+                print(f"  {name:<16} x{scale:<5} c={concurrency:<3} "
+                      f"p50={level['latency'].get('p50_ms', 0):8.1f}ms "
+                      f"p95={level['latency'].get('p95_ms', 0):8.1f}ms "
+                      f"{level['throughput_rps']:6.2f} req/s errors={level['errors']}")
+
+    return {
+        "scale": scale,
+        "caption_rows": rows,
+        "index_build_s": index_build_s,
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+
+def compare(current: dict, baseline: dict) -> None:
+    """Prints p95 latency and throughput deltas against a previous result file."""
+    def index(report):
+        out = {}
+        for scale_result in report["results"]:
+            for name, levels in scale_result["scenarios"].items():
+                for level in levels:
+                    out[(scale_result["scale"], name, level["concurrency"])] = level
+        return out
+
+    old = index(baseline)
+    print("\nscale scenario   conc   p95 old -> new (ms)        rps old -> new")
+    for key, level in sorted(index(current).items()):
+        if key not in old:
+            continue
+        before, after = old[key], level
+        p95_old = before["latency"].get("p95_ms", 0)
+        p95_new = after["latency"].get("p95_ms", 0)
+        change = (p95_new - p95_old) / p95_old * 100 if p95_old else 0.0
+        print(f"x{key[0]:<5} {key[1]:<10} {key[2]:<4} "
+              f"{p95_old:9.1f} -> {p95_new:9.1f} ({change:+6.1f}%)  "
+              f"{before['throughput_rps']:6.2f} -> {after['throughput_rps']:6.2f}")
+
+
+# -------------------------------
+# Entry point
+# -------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100,1000",
+                        help="Comma separated transcript multipliers (default: 1,10,100,1000)")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        help="Comma separated concurrency levels (default: 1,4,16)")
+    parser.add_argument("--requests", type=int, default=20,
+                        help="Requests per scenario and concurrency level (default: 20)")
+    parser.add_argument("--scenarios", default="search,summarize,fact_check",
+                        help="Comma separated subset of: search, summarize, fact_check, fact_check_batch")
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0,
+                        help="Simulated latency of each mocked Groq call")
+    parser.add_argument("--news-latency-ms", type=float, default=0.0,
+                        help="Simulated latency of each RSS / article page response")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    # Used for the per-scale child processes; runs every scale in this process.
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.scales = [int(s) for s in args.scales.split(",")]
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.scenarios = [s.strip() for s in args.scenarios.split(",")]
+    return args
+
+
+def run_scales_in_process(args) -> list:
+    groq_server, groq_url = start_server(MockGroqHandler, args.groq_latency_ms / 1000)
+    news_server, news_url = start_server(MockNewsHandler, args.news_latency_ms / 1000)
+
+    # Must be set before the app modules are imported, they read them at import time.
+    os.environ["GROQ_BASE_URL"] = groq_url
+    os.environ["NEWS_RSS_URL"] = f"{news_url}/rss/search"
+    os.environ.setdefault("GROQ_API_KEY", "mock-key")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    import main as main_module
+    instrument_stages(main_module)
+
+    results = []
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_e2e_") as workdir:
+            # The app reads and writes captions.csv / the index relative to the cwd.
+            os.chdir(workdir)
+            for scale in args.scales:
+                print(f"Scale x{scale}")
+                results.append(asyncio.run(run_scale(main_module, scale, args)))
+    finally:
+        os.chdir(cwd)
+        groq_server.shutdown()
+        news_server.shutdown()
+    return results
+
+
+def run_scale_subprocess(scale: int, args) -> dict:
+    """Runs one scale in a fresh interpreter and returns its result."""
+    with tempfile.TemporaryDirectory(prefix="bench_e2e_scale_") as tmp:
+        output = os.path.join(tmp, "result.json")
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.bench_e2e", "--in-process",
+            "--scales", str(scale),
+            "--concurrency", ",".join(map(str, args.concurrency)),
+            "--requests", str(args.requests),
+            "--scenarios", ",".join(args.scenarios),
+            "--groq-latency-ms", str(args.groq_latency_ms),
+            "--news-latency-ms", str(args.news_latency_ms),
+            "--output", output,
+        ], cwd=REPO_ROOT, check=True)
+        with open(output) as f:
+            return json.load(f)["results"][0]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "in_process")},
+        },
+        "results": [],
+    }
+
+    if args.in_process:
+        report["results"] = run_scales_in_process(args)
+    else:
+        report["results"] = [run_scale_subprocess(scale, args) for scale in args.scales]
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+bench_encoder.py
+----------------
+Compares the encoder backends and vector storage types from
+`src/Database/encoder.py` against the full-precision PyTorch path.
+
+For every backend it reports encoding throughput (captions/s) over the scaled
+transcript and model load time; for every backend x storage combination it
+reports index size and top-k agreement over the original, duplicate-free
+captions (overlap of the top-k caption ids with the torch/float32 reference,
+averaged over the queries).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_encoder --scale 10 --top-k 5 --output encoder_results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+
+from benchmarks.bench_e2e import CAPTIONS_CSV, REPO_ROOT, SEARCH_QUERIES
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.Database.encoder import BACKENDS, STORAGE_TYPES, build_index, encode, load_encoder
+
+REFERENCE = ("torch", "float32")
+
+
+def load_captions() -> list:
+    import pandas as pd
+    return pd.read_csv(CAPTIONS_CSV)["Caption"].tolist()
+
+
+def build_queries(captions: list, count: int) -> list:
+    """The fixed search queries plus evenly spaced captions used as queries."""
+    step = max(1, len(captions) // count)
+    return SEARCH_QUERIES + captions[::step][:count]
+
+
+def top_k_agreement(reference_ids, candidate_ids) -> float:
+    """Mean fraction of the reference top-k ids that the candidate also returns."""
+    total = 0.0
+    for ref, cand in zip(reference_ids, candidate_ids):
+        ref = set(int(i) for i in ref if i != -1)
+        total += len(ref & set(int(i) for i in cand)) / len(ref) if ref else 1.0
+    return total / len(reference_ids)
+
+
+def index_size_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--storage", default=",".join(STORAGE_TYPES))
+    parser.add_argument("--scale", type=int, default=10, help="captions.csv multiplier (default: 10)")
+    parser.add_argument("--queries", type=int, default=100, help="Captions reused as queries (default: 100)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", default="encoder_results.json")
+    args = parser.parse_args(argv)
+
+    captions = load_captions()
+    # Throughput runs on the scaled transcript; agreement on unique captions so
+    # duplicated rows don't turn top-k into ties.
+    scaled = captions * args.scale
+    queries = build_queries(captions, args.queries)
+    backends = args.backends.split(",")
+    storage_types = args.storage.split(",")
+    if REFERENCE[0] not in backends:
+        backends.insert(0, REFERENCE[0])
+    if REFERENCE[1] not in storage_types:
+        storage_types.insert(0, REFERENCE[1])
+
+    report = {"captions": len(scaled), "queries": len(queries), "top_k": args.top_k, "backends": {}}
+    reference_ids = None
+
+    for backend in backends:
+        try:
+            start = time.perf_counter()
+            model = load_encoder(backend)
+            load_s = time.perf_counter() - start
+        except Exception as e:
+            print(f"{backend:<11} skipped: {e}")
+            report["backends"][backend] = {"error": str(e)}
+            continue
+
+        encode(model, captions[:args.batch_size], args.batch_size)  # warm-up
+        start = time.perf_counter()
+        encode(model, scaled, args.batch_size)
+        encode_s = time.perf_counter() - start
+        embeddings = encode(model, captions, args.batch_size)
+        query_embeddings = encode(model, queries, args.batch_size)
+
+        result = {
+            "load_s": load_s,
+            "encode_s": encode_s,
+            "captions_per_s": len(scaled) / encode_s,
+            "storage": {},
+        }
+        print(f"{backend:<11} {result['captions_per_s']:9.1f} captions/s (load {load_s:.1f}s)")
+
+        for storage in storage_types:
+            index = build_index(embeddings, storage)
+            _, ids = index.search(query_embeddings, args.top_k)
+            if (backend, storage) == REFERENCE:
+                reference_ids = ids
+            result["storage"][storage] = {
+                "index_bytes": index_size_bytes(index),
+                "ids": ids,
+            }
+        report["backends"][backend] = result
+
+    if reference_ids is None:
+        sys.exit("The torch/float32 reference failed, cannot compute top-k agreement.")
+
+    # Agreement is computed once the reference ids are known.
+    for backend, result in report["backends"].items():
+        for storage, entry in result.get("storage", {}).items():
+            entry["top_k_agreement"] = top_k_agreement(reference_ids, entry.pop("ids"))
+            print(f"{backend:<11} {storage:<8} top-{args.top_k} agreement "
+                  f"{entry['top_k_agreement']:.3f}  index {entry['index_bytes'] / 1024:.0f} KiB")
+
+    output = os.path.abspath(args.output)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+mock_services.py
+----------------
+Local stand-ins for the external services the pipeline talks to, so the
+benchmarks can run without internet access:
+
+* a Groq-compatible chat completions server (used by the groq SDK and by
+  crawl4ai's LLM extraction through litellm),
+* a Google News style RSS feed server,
+* static article pages that the RSS items link to.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+ARTICLE_COUNT = 50
+ARTICLE_PARAGRAPHS = 8
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token estimate used for the mocked `usage` block."""
+    return max(1, len(text.split()))
+
+
+def _mock_reply(prompt: str) -> str:
+    """Pick a canned completion that the calling pipeline stage can parse."""
+    if "Refine the context" in prompt:
+        words = [w.strip(".,:;\"'") for w in prompt.split() if len(w) > 6]
+        keywords = list(dict.fromkeys(w.lower() for w in words if w.isalpha()))[:4]
+        return "```json\n" + json.dumps({
+            "context": "Refined benchmark context.",
+            "keywords": keywords or ["benchmark"],
+        }) + "\n```"
+    if "check-worthy factual claims" in prompt:
+        return "```json\n" + json.dumps({
+            "claims": [f"Mocked claim number {i}." for i in range(1, 6)],
+        }) + "\n```"
+    if "Does the evidence support the claim" in prompt:
+        return "```json\n" + json.dumps({
+            "factually_correct": True,
+            "confidence": 0.9,
+            "explanation": "Mocked verification.",
+        }) + "\n```"
+    if "Summarize this transcript" in prompt:
+        return "\n".join(f"* Mocked summary point {i}." for i in range(1, 11))
+    # crawl4ai's LLMExtractionStrategy expects the JSON payload inside <blocks> tags.
+    return "<blocks>" + json.dumps([{"content": "Mocked article body extracted by the LLM."}]) + "</blocks>"
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    """OpenAI/Groq compatible `POST .../chat/completions` endpoint."""
+
+    latency_s = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        reply = _mock_reply(prompt)
+
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        prompt_tokens = _count_tokens(prompt)
+        completion_tokens = _count_tokens(reply)
+        payload = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockNewsHandler(BaseHTTPRequestHandler):
+    """Serves `/rss/search?q=...` feeds and the `/articles/<n>.html` pages they link to."""
+
+    latency_s = 0.0
+    items_per_feed = 10
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, content_type: str):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path.rstrip("/") == "/rss/search":
+            query = urllib.parse.parse_qs(parsed.query).get("q", [""])[0]
+            self._send(self._feed(query), "application/rss+xml")
+        elif parsed.path.startswith("/articles/") and parsed.path.endswith(".html"):
+            article_id = parsed.path[len("/articles/"):-len(".html")]
+            self._send(self._article(article_id), "text/html")
+        else:
+            self.send_error(404)
+
+    def _base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _feed(self, query: str) -> str:
+        # Deterministic per query, so repeated runs crawl the same pages.
+        seed = int(hashlib.sha1(query.encode("utf-8")).hexdigest(), 16)
+        items = []
+        for i in range(self.items_per_feed):
+            # Like Google News, every third item is a syndicated copy of the previous story.
+            syndicated = i % 3 == 2
+            article_id = (seed + (i - 1 if syndicated else i) * 7) % ARTICLE_COUNT
+            publisher = "Wire Partner" if syndicated else "Mock Times"
+            items.append(
+                "<item>"
+                f"<title>{escape(f'Story {article_id} about {query} - {publisher}')}</title>"
+                f"<link>{self._base_url()}/articles/{article_id}.html?src={i}</link>"
+                "</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0"><channel><title>Mock News</title>'
+            + "".join(items)
+            + "</channel></rss>"
+        )
+
+    def _article(self, article_id: str) -> str:
+        paragraphs = "".join(
+            f"<p>Paragraph {i} of mock article {escape(article_id)}. "
+            "It repeats enough text to give the extraction step something to chew on.</p>"
+            for i in range(ARTICLE_PARAGRAPHS)
+        )
+        return f"<html><head><title>Article {escape(article_id)}</title></head><body><article>{paragraphs}</article></body></html>"
+
+
+def start_server(handler_cls, latency_s: float = 0.0, host: str = "127.0.0.1"):
+    """
+    Starts `handler_cls` on a free port in a daemon thread.
+    Returns the server (call `shutdown()` when done) and its base URL.
+    """
+    handler = type(handler_cls.__name__, (handler_cls,), {"latency_s": latency_s})
+    server = ThreadingHTTPServer((host, 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    groq_server, groq_url = start_server(MockGroqHandler)
+    news_server, news_url = start_server(MockNewsHandler)
+    print(f"GROQ_BASE_URL={groq_url}")
+    print(f"NEWS_RSS_URL={news_url}/rss/search")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        groq_server.shutdown()
+        news_server.shutdown()
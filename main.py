@@ -1,14 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
+from typing import List, Optional
 import os
 import dotenv
 import re
 import asyncio
 import json
-import pandas as pd
-from src.CC_capture import CC, load_cc
+from src.CC_capture import CC
 from src.Database import faiss_search
 from src.pipelines.fact_checker import FactChecker
+from src.pipelines.metrics import span, render_latest
+from src.pipelines.singleflight import SingleFlight, normalize_key
 import groq
 
 # Load environment variables
@@ -21,6 +23,14 @@ app = FastAPI(title="AI-Powered Podcast Search & Fact-Checker API")
 groq_client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
 fact_checker = FactChecker(groq_client)
 
+# Identical summaries / fact-checks requested at the same time share one pipeline run
+summarize_flight = SingleFlight("summarize")
+fact_check_flight = SingleFlight("fact_check")
+
+# Server-side caps for /fact-check/batch/; larger requested values are clamped
+MAX_BATCH_CLAIMS = 25
+MAX_BATCH_CONCURRENCY = 8
+
 # -------------------------------
 # 📌 Utility Functions
 # -------------------------------
@@ -30,23 +40,33 @@ def extract_video_id(url: str):
     return match.group(1) if match else None
 
 
-def get_context_around_timestamp(target_seconds: int, context_window: int = 10):
-    """Fetches context around a given timestamp from captions.csv."""
-    df = pd.read_csv("captions.csv")
-    context_rows = []
-
-    for ts_str, caption in zip(df["Timestamp"], df["Caption"]):
-        try:
-            hh, mm, ss = map(int, ts_str.split(":"))
-            t_sec = hh * 3600 + mm * 60 + ss
-            if abs(t_sec - target_seconds) <= context_window:
-                context_rows.append(caption)
-        except Exception:
-            continue
+def get_context_around_timestamp(target_seconds: int, context_window: int = 10, df=None):
+    """
+    Fetches context around a given timestamp from the captions `df`
+    (by default those of the current index).
+    """
+    with span("context_lookup"):
+        if df is None:
+            df = faiss_search.load_index().df
+        context_rows = []
+
+        for ts_str, caption in zip(df["Timestamp"], df["Caption"]):
+            try:
+                hh, mm, ss = map(int, ts_str.split(":"))
+                t_sec = hh * 3600 + mm * 60 + ss
+                if abs(t_sec - target_seconds) <= context_window:
+                    context_rows.append(caption)
+            except Exception:
+                continue
 
     return " ".join(context_rows)
 
 
+def fact_check_coalesced(context: str):
+    """Fact-checks the context, joining an identical fact-check already in flight."""
+    return fact_check_flight.do(normalize_key(context), lambda: fact_checker.fact_check(context))
+
+
 # -------------------------------
 # 📌 Request Models
 # -------------------------------
@@ -64,6 +84,13 @@ class FactCheckRequest(BaseModel):
     context_text: str
 
 
+class BatchFactCheckRequest(BaseModel):
+    claims: Optional[List[str]] = None  # Check these claims as-is
+    transcript: Optional[str] = None  # Otherwise extract claims from this text (default: the indexed captions)
+    max_claims: int = 10
+    max_concurrency: int = 4
+
+
 # -------------------------------
 # 🚀 1️⃣ Fetch Captions API
 # -------------------------------
@@ -73,6 +100,13 @@ def read_root():
     return {"message": "AI-Powered Podcast Search & Fact-Checker API is running!"}
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: stage latency histograms, token counts, cache hits and in-flight stages."""
+    content, content_type = render_latest()
+    return Response(content=content, media_type=content_type)
+
+
 @app.post("/fetch-captions/")
 async def fetch_captions(request: VideoURLRequest):
     video_url = request.video_url
@@ -86,12 +120,11 @@ async def fetch_captions(request: VideoURLRequest):
         if not caps_url:
             raise HTTPException(status_code=500, detail="Failed to fetch captions")
 
-        # Load and save captions
-        caps_json = load_cc.fetch_captions_json(caps_url)
-        load_cc.save_captions_to_csv(caps_json)
-
-        # Create FAISS index
-        faiss_search.create_faiss_index()
+        # Stream, save and index captions batch by batch, in a thread so searches
+        # keep being served (and see the early parts of the video) meanwhile
+        row_count = await asyncio.to_thread(faiss_search.stream_and_index_captions, caps_url)
+        if not row_count:
+            raise HTTPException(status_code=500, detail="No valid captions found")
 
         return {"message": "Captions fetched and indexed successfully", "video_id": video_id}
 
@@ -109,7 +142,9 @@ async def search_captions(request: SearchRequest):
     context_window = request.context_window
 
     try:
-        search_result = faiss_search.search_faiss(search_query)
+        # Search and context lookup use the same snapshot, even if a new one is published meanwhile
+        snapshot = faiss_search.load_index()
+        search_result = faiss_search.search_faiss(search_query, snapshot=snapshot)
         if not search_result:
             raise HTTPException(status_code=404, detail="No captions found")
 
@@ -124,11 +159,11 @@ async def search_captions(request: SearchRequest):
             target_seconds = 0
 
         # Get context around timestamp
-        full_context = get_context_around_timestamp(target_seconds, context_window)
+        full_context = get_context_around_timestamp(target_seconds, context_window, snapshot.df)
 
         # ✅ Perform Fact-Checking on full_context (Automatically)
         try:
-            fact_check_results = await fact_checker.fact_check(full_context)
+            fact_check_results = await fact_check_coalesced(full_context)
         except Exception as fc_error:
             fact_check_results = {"error": str(fc_error)}
 
@@ -152,10 +187,12 @@ async def search_captions(request: SearchRequest):
 @app.get("/summarize/")
 async def summarize_video():
     try:
-        df = pd.read_csv("captions.csv")
+        df = faiss_search.load_index().df
         full_transcript = " ".join(df["Caption"].tolist())
 
-        summary = await fact_checker.summarize_text(full_transcript)
+        summary = await summarize_flight.do(
+            normalize_key(full_transcript), lambda: fact_checker.summarize_text(full_transcript)
+        )
 
         return {"message": "Video summarized successfully", "summary": summary}
 
@@ -175,11 +212,42 @@ async def fact_check_context(request: FactCheckRequest):
         raise HTTPException(status_code=400, detail="Context text cannot be empty")
 
     try:
-        fc_results = await fact_checker.fact_check(context_text)
+        fc_results = await fact_check_coalesced(context_text)
 
         return {"message": "Fact-check completed", "results": fc_results}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# -------------------------------
+# 🚀 5️⃣ Batch Fact-Check API
+# -------------------------------
+
+@app.post("/fact-check/batch/")
+async def fact_check_batch(request: BatchFactCheckRequest):
+    if request.max_claims < 1 or request.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_claims and max_concurrency must be at least 1")
+    max_claims = min(request.max_claims, MAX_BATCH_CLAIMS)
+    max_concurrency = min(request.max_concurrency, MAX_BATCH_CONCURRENCY)
+
+    try:
+        if request.claims:
+            claims = request.claims[:max_claims]
+        else:
+            transcript = request.transcript
+            if not transcript:
+                df = faiss_search.load_index().df
+                transcript = " ".join(df["Caption"].tolist())
+            claims = await fact_checker.extract_claims(
+                transcript, max_claims, max_concurrency
+            )
+
+        results = await fact_checker.fact_check_batch(claims, max_concurrency)
+
+        return {"message": "Batch fact-check completed", "claims": claims, "results": results}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # uvicorn main:app --reload
\ No newline at end of file
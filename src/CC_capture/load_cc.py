@@ -3,10 +3,18 @@ load_cc.py
 -----------
 Fetches the captions JSON from a given URL, cleans it, and saves it as a CSV.
 Timestamps are converted into hh:mm:ss format.
+Long captions (e.g. 8-12 hour livestreams) can be streamed instead: the response
+is parsed incrementally and rows are written and handed on in batches as they arrive.
 """
 
+import os
+import tempfile
 import requests
 import csv
+import ijson
+
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read from the response at a time
+STREAM_BATCH_SIZE = 500  # caption rows per written / embedded batch
 
 def fetch_captions_json(captions_url: str) -> dict:
     """
@@ -20,6 +28,25 @@ def fetch_captions_json(captions_url: str) -> dict:
         print(f"Error fetching captions JSON: {e}")
         return None
 
+def event_to_row(event: dict):
+    """
+    Converts one json3 caption event into a [timestamp, caption] row, or None if it has no text.
+    """
+    if "segs" not in event:
+        return None
+    # Convert milliseconds to seconds
+    start_time = event.get("tStartMs", 0) / 1000.0
+    # Convert to hh:mm:ss format
+    hours = int(start_time // 3600)
+    minutes = int((start_time % 3600) // 60)
+    seconds = int(start_time % 60)
+    timestamp = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+    caption_text = " ".join(seg.get("utf8", "") for seg in event["segs"]).strip()
+    if caption_text and caption_text != "\\n":
+        return [timestamp, caption_text]
+    return None
+
 def save_captions_to_csv(captions_json: dict, output_csv: str = "captions.csv") -> None:
     """
     Parses the captions JSON, converts timestamps to hh:mm:ss format, and writes to CSV.
@@ -28,21 +55,8 @@ def save_captions_to_csv(captions_json: dict, output_csv: str = "captions.csv")
         print("Invalid captions JSON format.")
         return
 
-    data = []
-    for event in captions_json["events"]:
-        if "segs" in event:
-            # Convert milliseconds to seconds
-            start_time = event.get("tStartMs", 0) / 1000.0
-            # Convert to hh:mm:ss format
-            hours = int(start_time // 3600)
-            minutes = int((start_time % 3600) // 60)
-            seconds = int(start_time % 60)
-            timestamp = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
-            caption_text = " ".join(seg.get("utf8", "") for seg in event["segs"]).strip()
-            if caption_text and caption_text != "\\n":
-                data.append([timestamp, caption_text])
-    
+    data = [row for row in map(event_to_row, captions_json["events"]) if row]
+
     if not data:
         print("No valid captions found.")
         return
@@ -53,6 +67,67 @@ def save_captions_to_csv(captions_json: dict, output_csv: str = "captions.csv")
         writer.writerows(data)
     print(f"Captions saved to {output_csv}")
 
+def iter_caption_rows(captions_url: str, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Streams the captions JSON from the URL and yields [timestamp, caption] rows
+    as the `events` array is parsed, without holding the whole response in memory.
+    """
+    with requests.get(captions_url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True  # transparently gunzip
+        for event in ijson.items(response.raw, "events.item", buf_size=chunk_size, use_float=True):
+            row = event_to_row(event)
+            if row:
+                yield row
+
+def save_captions_stream(rows, output_csv: str = "captions.csv",
+                         batch_size: int = STREAM_BATCH_SIZE, on_batch=None) -> int:
+    """
+    Writes caption rows to CSV in batches as they arrive, flushing after each batch,
+    and passes every batch to `on_batch` (e.g. to embed and index it).
+    Rows go to a temp file that replaces `output_csv` only once the stream is complete,
+    so an empty or failed stream leaves the previous CSV untouched.
+    Returns the number of rows written.
+    """
+    count = 0
+    batch = []
+    # Unique per call, so concurrent ingests never share a temp file.
+    fd, tmp_csv = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(output_csv) + ".",
+                                   dir=os.path.dirname(output_csv) or ".")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Caption"])
+
+            def flush():
+                writer.writerows(batch)
+                f.flush()
+                if on_batch:
+                    on_batch(batch)
+
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    flush()
+                    count += len(batch)
+                    batch = []
+            if batch:
+                flush()
+                count += len(batch)
+
+        if count:
+            os.chmod(tmp_csv, 0o644)  # mkstemp creates the file owner-only
+            os.replace(tmp_csv, output_csv)
+    finally:
+        if os.path.exists(tmp_csv):
+            os.remove(tmp_csv)
+
+    if count:
+        print(f"Captions saved to {output_csv}")
+    else:
+        print("No valid captions found.")
+    return count
+
 if __name__ == "__main__":
     url = input("Enter Captions URL: ")
     json_data = fetch_captions_json(url)
@@ -0,0 +1,80 @@
+"""
+encoder.py
+----------
+Loads the MiniLM sentence encoder with a selectable CPU inference backend and
+builds the FAISS index with a selectable vector storage type.
+
+Both are configured through environment variables (or `.env`):
+
+EMBEDDING_BACKEND  torch (default) | torch-int8 | onnx | onnx-int8
+EMBEDDING_STORAGE  float32 (default) | float16 | int8
+"""
+
+import os
+import dotenv
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+dotenv.load_dotenv()
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Pre-quantized ONNX export shipped in the model repository; override for other CPUs
+# (e.g. onnx/model_qint8_avx512_vnni.onnx or onnx/model_qint8_arm64.onnx).
+ONNX_INT8_FILE = os.getenv("ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32")
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+STORAGE_TYPES = ("float32", "float16", "int8")
+
+
+def load_encoder(backend: str = None) -> SentenceTransformer:
+    """
+    Returns the sentence encoder for the given backend (defaults to EMBEDDING_BACKEND).
+    The ONNX backends need `optimum[onnxruntime]` installed.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "torch":
+        return SentenceTransformer(MODEL_NAME, device="cpu")
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(MODEL_NAME, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(MODEL_NAME, device="cpu", backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(MODEL_NAME, device="cpu", backend="onnx",
+                                   model_kwargs={"file_name": ONNX_INT8_FILE})
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}, expected one of {BACKENDS}")
+
+
+def encode(model: SentenceTransformer, texts, batch_size: int = 64) -> np.ndarray:
+    """Encodes a string or list of strings into a float32 matrix."""
+    if isinstance(texts, str):
+        texts = [texts]
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True).astype("float32")
+
+
+def build_index(embeddings: np.ndarray, storage: str = None) -> faiss.Index:
+    """
+    Builds an L2 FAISS index over `embeddings` using the given vector storage
+    (defaults to EMBEDDING_STORAGE). float16 halves and int8 quarters the index size.
+    """
+    storage = storage or EMBEDDING_STORAGE
+    dimension = embeddings.shape[1]
+    if storage == "float32":
+        index = faiss.IndexFlatL2(dimension)
+    elif storage == "float16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    elif storage == "int8":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    else:
+        raise ValueError(f"Unknown EMBEDDING_STORAGE {storage!r}, expected one of {STORAGE_TYPES}")
+
+    if not index.is_trained:
+        # int8 learns per-dimension ranges from the data itself.
+        index.train(embeddings)
+    index.add(embeddings)
+    return index
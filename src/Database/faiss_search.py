@@ -3,55 +3,160 @@ faiss_search.py
 ----------------
 Generates embeddings for captions using SentenceTransformers,
 builds a FAISS index, and provides search functionality.
+Indexes are published as versioned, memory-mapped snapshots (see snapshots.py),
+so several worker processes share one copy and pick up rebuilds without downtime.
 """
 
-import faiss
+import threading
+
 import pandas as pd
 import numpy as np
-import pickle
-from sentence_transformers import SentenceTransformer
 
-MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
-FAISS_INDEX_FILE = "faiss_index.bin"
+from src.CC_capture import load_cc
+from src.Database.encoder import build_index, encode, load_encoder
+from src.Database.snapshots import SnapshotReader, publish_snapshot, set_current_version
+from src.pipelines.metrics import span
+
 CSV_FILE = "captions.csv"
 
-# Initialize the embedding model once
-model = SentenceTransformer(MODEL_NAME)
+# Initialize the embedding model once, with the backend selected by EMBEDDING_BACKEND
+model = load_encoder()
 
 def get_embedding(text: str) -> np.ndarray:
     """
     Returns the embedding for the given text.
     """
-    return model.encode(text, convert_to_numpy=True)
+    with span("embedding"):
+        return encode(model, text)[0]
+
+def get_embeddings(texts: list) -> np.ndarray:
+    """
+    Returns the embeddings for a list of texts, encoded in batches.
+    """
+    with span("embedding_batch"):
+        return encode(model, texts)
 
 def create_faiss_index():
     """
-    Loads captions from CSV, generates embeddings, and saves a FAISS index along with metadata.
+    Loads captions from CSV, generates embeddings, and publishes a new index snapshot along with metadata.
     """
     df = pd.read_csv(CSV_FILE)
     captions = df["Caption"].tolist()
-    embeddings = np.array([get_embedding(c) for c in captions]).astype("float32")
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
+    embeddings = get_embeddings(captions)
+    index = build_index(embeddings)
     # Save both index and DataFrame together for later retrieval.
-    with open(FAISS_INDEX_FILE, "wb") as f:
-        pickle.dump((index, df), f)
-    print("FAISS index created and saved.")
+    version = publish_snapshot(index, df)
+    print(f"FAISS index snapshot {version} created and published.")
+
+class IncrementalIndexBuilder:
+    """
+    Builds the index from caption batches as they arrive (see load_cc.save_captions_stream).
+    A snapshot is published after the first `publish_every` rows and then each time
+    the row count doubles, so the start of a long video becomes searchable early
+    while the total snapshot writes stay proportional to the final index size.
+    The index and caption rows of the whole video are kept in memory, since every
+    snapshot holds all of them; only parsing and CSV writing are bounded by the batch size.
+    If the stream fails, `abort()` points CURRENT back at the version that was live
+    before the build; on a first-ever build the partial index stays live.
+    """
+
+    def __init__(self, publish_every: int = 1000):
+        self.index = None
+        self.frames = []
+        self.rows = 0
+        self.published_rows = 0
+        self.next_publish = publish_every
+        # Keep the previous version open (and so locked against garbage collection) until the build is done.
+        try:
+            self.previous = _reader.get()
+        except FileNotFoundError:
+            self.previous = None
+
+    def add_batch(self, rows: list):
+        """Embeds a batch of [timestamp, caption] rows and adds it to the index."""
+        df = pd.DataFrame(rows, columns=["Timestamp", "Caption"])
+        embeddings = get_embeddings(df["Caption"].tolist())
+        if self.index is None:
+            # int8 storage learns its value ranges from this first batch.
+            self.index = build_index(embeddings)
+        else:
+            self.index.add(embeddings)
+        self.frames.append(df)
+        self.rows += len(df)
+        if self.rows >= self.next_publish:
+            self.publish()
+            self.next_publish = self.rows * 2
+
+    def publish(self):
+        """Publishes everything indexed so far as a new snapshot."""
+        if self.index is None or self.rows == self.published_rows:
+            return None
+        self.frames = [pd.concat(self.frames, ignore_index=True)]
+        version = publish_snapshot(self.index, self.frames[0])
+        self.published_rows = self.rows
+        print(f"FAISS index snapshot {version} published with {self.rows} captions.")
+        return version
+
+    def finish(self):
+        """Publishes the remaining rows; call once the caption stream is exhausted."""
+        version = self.publish()
+        self.previous = None
+        return version
+
+    def abort(self):
+        """Restores the version that was CURRENT before this build, if one was partially published."""
+        if self.published_rows and self.previous is not None:
+            set_current_version(self.previous.version)
+            print(f"FAISS index build failed; restored snapshot {self.previous.version}.")
+        self.previous = None
+
+_ingest_lock = threading.Lock()
+
+def stream_and_index_captions(captions_url: str, output_csv: str = CSV_FILE) -> int:
+    """
+    Streams captions from the URL to `output_csv` and the FAISS index, batch by batch.
+    Returns the number of rows; on failure the previously indexed video stays current.
+    Ingests in one process run one at a time, so partial snapshots of different
+    videos never alternate and a failed ingest can't roll back a newer one.
+    """
+    with _ingest_lock:
+        builder = IncrementalIndexBuilder()
+        try:
+            row_count = load_cc.save_captions_stream(
+                load_cc.iter_caption_rows(captions_url), output_csv, on_batch=builder.add_batch
+            )
+            builder.finish()
+        except BaseException:
+            builder.abort()
+            raise
+        return row_count
+
+# One reader per process; it follows the CURRENT pointer across rebuilds.
+_reader = SnapshotReader()
+
+def load_index():
+    """
+    Returns the current index snapshot (`.index`, `.df`, `.version`).
+    Keep the returned object while using it, it pins that version on disk.
+    """
+    with span("index_load"):
+        return _reader.get()
 
-def search_faiss(query: str, top_k: int = 1):
+def search_faiss(query: str, top_k: int = 1, snapshot=None):
     """
     Searches for the caption most similar to the query.
     Returns the corresponding row from the DataFrame.
+    Pass the `snapshot` from load_index() to read more captions of the same version afterwards.
     """
-    with open(FAISS_INDEX_FILE, "rb") as f:
-        index, df = pickle.load(f)
-    query_embedding = get_embedding(query).astype("float32").reshape(1, -1)
-    distances, indices = index.search(query_embedding, top_k)
+    if snapshot is None:
+        snapshot = load_index()
+    query_embedding = get_embedding(query).reshape(1, -1)
+    with span("faiss_search"):
+        distances, indices = snapshot.index.search(query_embedding, top_k)
     if indices[0][0] == -1:
         return None
     # Return the best matching result along with its distance.
-    row = df.iloc[indices[0][0]]
+    row = snapshot.df.iloc[indices[0][0]]
     return {"timestamp": row["Timestamp"], "caption": row["Caption"], "distance": distances[0][0]}
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""
+snapshots.py
+-------------
+Immutable, versioned FAISS index snapshots that can be shared by several
+processes (e.g. uvicorn workers) without downtime.
+
+Layout under SNAPSHOT_DIR:
+
+    CURRENT                 name of the published version
+    <version>/index.faiss   FAISS index, opened read-only and memory-mapped
+    <version>/captions.csv  caption rows matching the index ids
+    <version>/.lock         readers hold a shared flock while they use the version
+
+A new version is written to a temporary directory and published by renaming
+it into place and atomically replacing CURRENT. Readers notice the new
+pointer on their next lookup and switch over. A version is garbage-collected
+once it is no longer CURRENT and no process holds its lock.
+"""
+
+import fcntl
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import faiss
+import pandas as pd
+
+SNAPSHOT_DIR = "faiss_snapshots"
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.faiss"
+CAPTIONS_FILE = "captions.csv"
+LOCK_FILE = ".lock"
+TMP_PREFIX = ".tmp-"
+# Unfinished temp directories older than this are assumed to be from a crashed writer.
+STALE_TMP_SECONDS = 3600
+
+# Zero-copy mmap for flat / scalar-quantized indexes needs faiss >= 1.10; older
+# versions fall back to plain mmap, which only maps inverted lists.
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+class IndexSnapshot:
+    """
+    A read-only view of one snapshot version.
+    Holds a shared lock on the version for as long as the object is alive,
+    so keep a reference for the duration of a search.
+    """
+
+    def __init__(self, version: str, snapshot_dir: str = SNAPSHOT_DIR):
+        path = os.path.join(snapshot_dir, version)
+        self.version = version
+        self._lock = None
+        self._lock = open(os.path.join(path, LOCK_FILE), "rb")
+        fcntl.flock(self._lock, fcntl.LOCK_SH)
+        try:
+            # The garbage collector may have removed the version between reading
+            # CURRENT and taking the lock; it holds an exclusive lock while deleting.
+            if not os.path.exists(os.path.join(path, INDEX_FILE)):
+                raise FileNotFoundError(f"Snapshot {version} was garbage-collected")
+            self.index = faiss.read_index(os.path.join(path, INDEX_FILE), MMAP_FLAGS)
+            self.df = pd.read_csv(os.path.join(path, CAPTIONS_FILE))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._lock is not None:
+            self._lock.close()  # releases the flock
+            self._lock = None
+
+    def __del__(self):
+        self.close()
+
+
+def read_current_version(snapshot_dir: str = SNAPSHOT_DIR):
+    """Returns the published version name, or None if nothing was published yet."""
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(index, df: pd.DataFrame, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    Writes `index` and `df` as a new immutable version and makes it CURRENT.
+    Returns the new version name.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # Sortable by creation time, unique across concurrent writers.
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    tmp_path = os.path.join(snapshot_dir, TMP_PREFIX + version)
+    os.makedirs(tmp_path)
+
+    faiss.write_index(index, os.path.join(tmp_path, INDEX_FILE))
+    df.to_csv(os.path.join(tmp_path, CAPTIONS_FILE), index=False)
+    for name in (INDEX_FILE, CAPTIONS_FILE):
+        _fsync(os.path.join(tmp_path, name))
+
+    # Hold a reader lock from before the rename until CURRENT points at the new
+    # version, so a concurrent collect_garbage can't delete it in between.
+    with open(os.path.join(tmp_path, LOCK_FILE), "wb") as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        os.rename(tmp_path, os.path.join(snapshot_dir, version))
+        set_current_version(version, snapshot_dir)
+
+    collect_garbage(snapshot_dir)
+    return version
+
+
+def set_current_version(version: str, snapshot_dir: str = SNAPSHOT_DIR) -> None:
+    """
+    Atomically points CURRENT at an existing version.
+    The caller must hold a lock on that version so it can't be collected meanwhile.
+    """
+    pointer_tmp = os.path.join(snapshot_dir, f"{TMP_PREFIX}{CURRENT_FILE}-{version}-{uuid.uuid4().hex[:8]}")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(snapshot_dir, CURRENT_FILE))
+
+
+def collect_garbage(snapshot_dir: str = SNAPSHOT_DIR) -> list:
+    """
+    Deletes versions that are not CURRENT and not locked by any reader,
+    plus stale temp files from crashed writers. Returns the removed names.
+    """
+    current = read_current_version(snapshot_dir)
+    removed = []
+    try:
+        names = os.listdir(snapshot_dir)
+    except FileNotFoundError:
+        return removed
+
+    for name in names:
+        path = os.path.join(snapshot_dir, name)
+        if name.startswith(TMP_PREFIX):
+            try:
+                if time.time() - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                    _remove(path)
+                    removed.append(name)
+            except FileNotFoundError:
+                pass
+            continue
+        if name == current or not os.path.isdir(path):
+            continue
+        try:
+            lock = open(os.path.join(path, LOCK_FILE), "rb")
+        except FileNotFoundError:
+            continue
+        with lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # still in use by some reader
+            if name == read_current_version(snapshot_dir):
+                continue  # published after the first read of CURRENT
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+class SnapshotReader:
+    """
+    Per-process handle on the current snapshot.
+    `get()` returns the open snapshot and transparently switches to a newly
+    published version; in-flight searches keep using the version they started with.
+    """
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> IndexSnapshot:
+        version = read_current_version(self.snapshot_dir)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        if version is None:
+            raise FileNotFoundError("No FAISS index snapshot has been published yet")
+
+        with self._lock:
+            for _ in range(3):
+                if self._snapshot is not None and self._snapshot.version == version:
+                    return self._snapshot
+                try:
+                    new_snapshot = IndexSnapshot(version, self.snapshot_dir)
+                except FileNotFoundError:
+                    # Replaced and collected while we were opening it; retry with the new pointer.
+                    version = read_current_version(self.snapshot_dir)
+                    continue
+                self._snapshot = new_snapshot
+                break
+            else:
+                raise FileNotFoundError("Could not open the current FAISS index snapshot")
+
+        # The previous version is released once the last in-flight search drops it.
+        del snapshot
+        collect_garbage(self.snapshot_dir)
+        return self._snapshot
+
+
+def _fsync(path: str):
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _remove(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.remove(path)
@@ -6,20 +6,22 @@ Streamlit UI for the AI-Powered Podcast Search & Fact-Checker.
 
 import streamlit as st
 import os
-import pandas as pd
 import asyncio
 import json
 import dotenv
 import groq
 import re
+import threading
+from crawl4ai import AsyncWebCrawler, BrowserConfig
 
 # Load environment variables
 dotenv.load_dotenv()
 
 # Import custom modules
-from src.CC_capture import CC, load_cc
+from src.CC_capture import CC
 from src.Database import faiss_search
 from src.pipelines.fact_checker import FactChecker
+from src.pipelines.singleflight import SingleFlight, normalize_key
 
 # Streamlit UI settings
 st.set_page_config(page_title="AI Video Search & Fact-Checker",
@@ -36,6 +38,77 @@ if "summary" not in st.session_state:
     st.session_state.summary = None
 if "fc_results" not in st.session_state:
     st.session_state.fc_results = None
+# Background jobs (concurrent.futures.Future) for the long-running operations
+for job in ("fetch_job", "summary_job", "fc_job"):
+    if job not in st.session_state:
+        st.session_state[job] = None
+
+# -------------------------------
+# Shared resources (one per Streamlit server, shared by all sessions)
+# -------------------------------
+
+@st.cache_resource
+def get_event_loop():
+    """Event loop running in a background thread; long operations are scheduled on it."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def run_in_background(coro):
+    """Schedules a coroutine on the shared loop and returns its Future without waiting."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+@st.cache_resource
+def get_crawler():
+    """Headless browser kept open across fact-checks instead of launching one per click."""
+    crawler = AsyncWebCrawler(config=BrowserConfig(headless=True))
+    run_in_background(crawler.start()).result()
+    return crawler
+
+@st.cache_resource
+def get_fact_checker():
+    groq_client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
+    return FactChecker(groq_client, crawler=get_crawler())
+
+@st.cache_resource
+def get_flights():
+    """Sessions asking for the same summary or fact-check at the same time share one run."""
+    return {"summarize": SingleFlight("summarize"), "fact_check": SingleFlight("fact_check")}
+
+@st.cache_data(max_entries=4)
+def load_captions(version, _snapshot):
+    """
+    Captions of an index version with timestamps pre-parsed to seconds.
+    Cached by `version`; `_snapshot` is the open snapshot of that version and is not hashed.
+    """
+    df = _snapshot.df.copy()
+    def to_seconds(ts_str):
+        try:
+            hh, mm, ss = map(int, ts_str.split(":"))
+            return hh * 3600 + mm * 60 + ss
+        except Exception:
+            return None
+    df["Seconds"] = df["Timestamp"].map(to_seconds)
+    return df
+
+def poll_job(job_key, on_done):
+    """
+    Shows progress for a background job without blocking the rest of the page.
+    Once the job finishes, `on_done` receives the result (or exception) and the app reruns.
+    """
+    job = st.session_state[job_key]
+    if job is None:
+        return
+
+    @st.fragment(run_every=1)
+    def poll():
+        if not job.done():
+            st.info("⏳ Running in the background, you can keep using the app...")
+            return
+        st.session_state[job_key] = None
+        on_done(job.result() if job.exception() is None else job.exception())
+        st.rerun()
+    poll()
 
 # -------------------------------
 # Section 1: Fetch Captions & Video Preview
@@ -53,20 +126,31 @@ video_id = extract_video_id(video_url) if video_url else None
 if video_id:
     st.video(f"https://www.youtube.com/embed/{video_id}")  # Embed YouTube video
 
-if st.button("Fetch Captions") and video_url:
-    st.write("Fetching captions...")
+def fetch_and_index(video_url):
     caps_url = CC.fetch_captions(video_url)
     # fetch cookies
     CC.get_cookies(video_url)
-    if caps_url:
-        st.success("Captions fetched! Generating FAISS index...")
-        caps_json = load_cc.fetch_captions_json(caps_url)
-        if caps_json:
-            load_cc.save_captions_to_csv(caps_json)
-            faiss_search.create_faiss_index()
-            st.success("Captions indexed successfully.")
+    if not caps_url:
+        return False
+    # Rows are written and indexed batch by batch; searches see the early parts first
+    return faiss_search.stream_and_index_captions(caps_url) > 0
+
+def on_fetch_done(result):
+    if result is True:
+        st.session_state.fetch_message = ("success", "Captions indexed successfully.")
+    elif isinstance(result, Exception):
+        st.session_state.fetch_message = ("error", f"Fetching captions failed: {result}")
     else:
-        st.error("Failed to fetch captions. Check your URL and cookies.")
+        st.session_state.fetch_message = ("error", "Failed to fetch captions. Check your URL and cookies.")
+
+if st.button("Fetch Captions") and video_url and st.session_state.fetch_job is None:
+    st.session_state.fetch_message = None
+    st.session_state.fetch_job = run_in_background(asyncio.to_thread(fetch_and_index, video_url))
+
+poll_job("fetch_job", on_fetch_done)
+if st.session_state.get("fetch_message"):
+    level, message = st.session_state.fetch_message
+    getattr(st, level)(message)
 
 # -------------------------------
 # Section 2: Search Captions
@@ -77,7 +161,10 @@ context_window = st.number_input("⏳ Context window (seconds)", min_value=5, ma
 
 if st.button("Search") and search_query:
     st.write("Searching...")
-    result = faiss_search.search_faiss(search_query)
+    # faiss_search keeps the memory-mapped index open and follows new versions itself;
+    # the match and its context are both read from this one snapshot
+    snapshot = faiss_search.load_index()
+    result = faiss_search.search_faiss(search_query, snapshot=snapshot)
 
     if result:
         timestamp = result["timestamp"]
@@ -96,18 +183,9 @@ if st.button("Search") and search_query:
         st.session_state.search_result = {"timestamp": timestamp, "caption": caption, "video_link": video_link}
 
         # Store context in session state
-        df = pd.read_csv("captions.csv")
-        context_rows = []
-        for ts_str, caption in zip(df["Timestamp"], df["Caption"]):
-            try:
-                hh, mm, ss = map(int, ts_str.split(":"))
-                t_sec = hh * 3600 + mm * 60 + ss
-                if abs(t_sec - target_seconds) <= context_window:
-                    context_rows.append(caption)
-            except Exception:
-                continue
-        
-        st.session_state.full_context = " ".join(context_rows)
+        df = load_captions(snapshot.version, snapshot)
+        in_window = (df["Seconds"] - target_seconds).abs() <= context_window
+        st.session_state.full_context = " ".join(df.loc[in_window, "Caption"])
 
 # Display Search Results Persistently
 if st.session_state.search_result:
@@ -125,21 +203,30 @@ if st.session_state.search_result:
 # -------------------------------
 st.header("📝 3. Summarize Video")
 
-if st.button("Summarize Video"):
-    try:
-        st.write("Generating summary... Please wait.")
+def on_summary_done(result):
+    if isinstance(result, Exception):
+        st.session_state.summary = f"Summarization failed: {str(result)}"
+    else:
+        st.session_state.summary = result
 
+if st.button("Summarize Video") and st.session_state.summary_job is None:
+    try:
         # Load full captions
-        df = pd.read_csv("captions.csv")
+        snapshot = faiss_search.load_index()
+        df = load_captions(snapshot.version, snapshot)
         full_transcript = " ".join(df["Caption"].tolist())
 
         # Send the transcript to the summarization function
-        fact_checker = FactChecker(groq.Client(api_key=os.getenv("GROQ_API_KEY")))
-        st.session_state.summary = asyncio.run(fact_checker.summarize_text(full_transcript))
+        fact_checker = get_fact_checker()
+        st.session_state.summary_job = run_in_background(get_flights()["summarize"].do(
+            normalize_key(full_transcript), lambda: fact_checker.summarize_text(full_transcript)
+        ))
 
     except Exception as e:
         st.error(f"Summarization failed: {str(e)}")
 
+poll_job("summary_job", on_summary_done)
+
 # Display Summary Persistently
 if st.session_state.summary:
     st.subheader("📌 Video Summary")
@@ -150,21 +237,28 @@ if st.session_state.summary:
 # -------------------------------
 st.header("✅ 4. Fact-Check Context")
 
-if st.button("🔍 Refine & Fact-Check"):
+def on_fact_check_done(result):
+    if isinstance(result, Exception):
+        st.session_state.fc_results = {"error": f"Fact-checking failed: {str(result)}"}
+    else:
+        st.session_state.fc_results = result
+
+if st.button("🔍 Refine & Fact-Check") and st.session_state.fc_job is None:
     if not st.session_state.full_context:
         st.error("Please perform a search first.")
     else:
         try:
-            with st.spinner("Running fact-checking pipeline..."):
-                groq_client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
-                fact_checker = FactChecker(groq_client)
-                st.session_state.fc_results = asyncio.run(
-                    fact_checker.fact_check(st.session_state.full_context)
-                )
+            context = st.session_state.full_context
+            fact_checker = get_fact_checker()
+            st.session_state.fc_job = run_in_background(get_flights()["fact_check"].do(
+                normalize_key(context), lambda: fact_checker.fact_check(context)
+            ))
         except Exception as e:
             st.error(f"Fact-checking failed: {str(e)}")
             st.session_state.fc_results = {"error": str(e)}
 
+poll_job("fc_job", on_fact_check_done)
+
 # Display Fact-Check Results Persistently
 if st.session_state.fc_results:
     fc_results = st.session_state.fc_results
@@ -0,0 +1,139 @@
+"""
+dedupe.py
+----------
+Near-duplicate detection for fact-check evidence.
+News feeds often return syndicated copies of the same wire story under different
+domains. Links are deduplicated before crawling by canonical URL and normalized
+title, and crawled articles are deduplicated again by MinHash similarity of their
+bodies, so only distinct evidence is crawled and sent to the LLM.
+"""
+
+import hashlib
+import re
+import unicodedata
+import urllib.parse
+
+import numpy as np
+
+# Query parameters that only track where a click came from. Generic names such as
+# `ref` or `cid` are left alone because some sites use them to select the content.
+TRACKING_PARAMS = {"gclid", "fbclid", "ocid", "cmpid", "mc_cid", "mc_eid", "ref_src", "smid", "taid"}
+TRACKING_PREFIXES = ("utm_",)
+HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, np.iinfo(np.int64).max, NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, np.iinfo(np.int64).max, NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns a canonical form of the URL: lowercase host without www./m./amp.,
+    no scheme, fragment, tracking parameters, trailing slash or /amp suffix.
+    """
+    parsed = urllib.parse.urlsplit(url.strip())
+    host = (parsed.hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    path = re.sub(r"/(amp/?)?$", "", parsed.path) or "/"
+    query = sorted(
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    canonical = host + path
+    if query:
+        canonical += "?" + urllib.parse.urlencode(query)
+    return canonical
+
+
+def normalize_title(title: str) -> str:
+    """
+    Lowercases the title, strips accents and punctuation, and removes the
+    trailing " - Publisher" that Google News appends to every headline.
+    """
+    if " - " in title:
+        title = title.rsplit(" - ", 1)[0]
+    return _normalize_text(title)
+
+
+def _normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def dedupe_links(links: list, limit: int = None) -> tuple:
+    """
+    Drops links whose canonical URL or normalized title was already seen.
+    Keeps the first occurrence, so feed ranking is preserved, and stops once
+    `limit` distinct links are found.
+    Returns the distinct links and the number of duplicates skipped to find them.
+    """
+    seen_urls, seen_titles, distinct = set(), set(), []
+    skipped = 0
+    for link_obj in links:
+        if limit is not None and len(distinct) >= limit:
+            break
+        url_key = canonicalize_url(link_obj.get("link", ""))
+        title_key = normalize_title(link_obj.get("title", ""))
+        if url_key in seen_urls or (title_key and title_key in seen_titles):
+            skipped += 1
+            continue
+        seen_urls.add(url_key)
+        if title_key:
+            seen_titles.add(title_key)
+        distinct.append(link_obj)
+    return distinct, skipped
+
+
+def _shingles(text: str) -> set:
+    words = _normalize_text(text).split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of the word shingles of `text`."""
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in _shingles(text)],
+        dtype=np.uint64,
+    )
+    permuted = ((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def dedupe_articles(articles: list, threshold: float = SIMILARITY_THRESHOLD) -> list:
+    """
+    Drops articles whose body is a near-duplicate (estimated Jaccard similarity
+    >= threshold) of an article kept earlier. Articles without content are kept as-is.
+    """
+    kept_signatures, distinct = [], []
+    for article in articles:
+        content = article.get("content", "")
+        if not content.strip():
+            distinct.append(article)
+            continue
+        signature = minhash_signature(content)
+        if any(estimate_similarity(signature, kept) >= threshold for kept in kept_signatures):
+            continue
+        kept_signatures.append(signature)
+        distinct.append(article)
+    return distinct
@@ -1,12 +1,12 @@
 import faiss
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import os
 
+from src.Database.encoder import build_index, encode, load_encoder
+
 CSV_FILE = "captions.csv"
 FAISS_INDEX_FILE = "faiss_index.pkl"
-EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 def create_faiss_index():
     """Converts captions to embeddings and stores them in FAISS."""
@@ -17,12 +17,10 @@ def create_faiss_index():
     df = pd.read_csv(CSV_FILE)
     captions = df["Caption"].tolist()
     
-    model = SentenceTransformer(EMBEDDING_MODEL)
-    embeddings = model.encode(captions, convert_to_numpy=True)
+    model = load_encoder()
+    embeddings = encode(model, captions)
 
-    d = embeddings.shape[1]  
-    index = faiss.IndexFlatL2(d)
-    index.add(embeddings)
+    index = build_index(embeddings)
 
     faiss.write_index(index, FAISS_INDEX_FILE)
     print("FAISS index saved.")
@@ -3,11 +3,19 @@ fact_checker.py
 ----------------
 Uses Groq’s llama-3.1-8b-instant model to refine the context extracted from captions,
 and then uses crawl4ai to verify the refined claim online.
+Whole transcripts can be checked in batch: claims are extracted first and then
+fact-checked concurrently, sharing evidence fetches through an EvidencePool.
 """
 
 import os
 import json
 import asyncio
+import contextlib
+import itertools
+import math
+import threading
+import types
+import weakref
 import dotenv
 import streamlit as st
 import feedparser
@@ -18,11 +26,132 @@ import groq
 import crawl4ai 
 from crawl4ai import LLMExtractionStrategy, CrawlerRunConfig, CacheMode, BrowserConfig, AsyncWebCrawler
 
+from src.pipelines.dedupe import canonicalize_url, dedupe_articles, dedupe_links
+from src.pipelines.metrics import span, record_token_usage, record_cache, record_duplicates
+
 dotenv.load_dotenv()
 
+# Overridable so the pipeline can run against local stand-ins (see benchmarks/).
+NEWS_RSS_URL = os.getenv("NEWS_RSS_URL", "https://news.google.com/rss/search")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+
+# Transcripts are split into chunks of this many words for claim extraction;
+# longer transcripts are sampled down to at most MAX_CLAIM_CHUNKS chunks.
+CLAIM_CHUNK_WORDS = 3000
+MAX_CLAIM_CHUNKS = 8
+
+# Groq calls, feed fetches and crawls of all concurrent batch fact-checks in a
+# process share this budget, on top of each batch's own `max_concurrency`.
+MAX_PROCESS_CONCURRENCY = int(os.getenv("FACT_CHECK_MAX_CONCURRENCY", "16"))
+_process_limits = weakref.WeakKeyDictionary()
+
+
+def process_limit() -> asyncio.Semaphore:
+    """The process-wide batch concurrency budget for the running event loop."""
+    loop = asyncio.get_running_loop()
+    limit = _process_limits.get(loop)
+    if limit is None:
+        limit = _process_limits[loop] = asyncio.Semaphore(MAX_PROCESS_CONCURRENCY)
+    return limit
+
+# Guards the reported-token watermarks of extraction strategies shared by concurrent crawls.
+_EXTRACTION_USAGE_LOCK = threading.Lock()
+
+
+class MeteredLLMExtractionStrategy(LLMExtractionStrategy):
+    """
+    LLMExtractionStrategy that reports its latency and Groq token usage as the
+    `crawl_extract` stage. crawl4ai only keeps a running `total_usage` per strategy,
+    so each run records the tokens added since the last report.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reported_usage = {"prompt": 0, "completion": 0}
+
+    def run(self, *args, **kwargs):
+        with span("crawl_extract"):
+            try:
+                return super().run(*args, **kwargs)
+            finally:
+                self.record_usage()
+
+    def record_usage(self):
+        with _EXTRACTION_USAGE_LOCK:
+            totals = {
+                kind: getattr(self.total_usage, f"{kind}_tokens", None) or 0
+                for kind in self.reported_usage
+            }
+            delta = types.SimpleNamespace(**{
+                f"{kind}_tokens": totals[kind] - self.reported_usage[kind] for kind in totals
+            })
+            self.reported_usage = totals
+        record_token_usage("crawl_extract", delta)
+
+
+class EvidencePool:
+    """
+    Shared state for one batch of fact-checks.
+    Identical keyword queries and URLs are fetched once and the result is reused
+    by every claim that needs it, and `limited()` caps the number of Groq calls,
+    feed fetches and crawls running at the same time across the whole batch
+    and across all batches in the process (see process_limit).
+    """
+
+    def __init__(self, fact_checker, crawler, max_concurrency: int = 4):
+        self.fact_checker = fact_checker
+        self.crawler = crawler
+        self.limit = asyncio.Semaphore(max_concurrency)
+        # Keywords are not known per URL once shared, so use a keyword-free instruction.
+        self.crawl_config = fact_checker.build_crawl_config()
+        self.link_tasks = {}
+        self.article_tasks = {}
+
+    def _shared(self, tasks: dict, key, cache: str, factory) -> asyncio.Future:
+        task = tasks.get(key)
+        record_cache(cache, task is not None)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(factory())
+        return task
+
+    @contextlib.asynccontextmanager
+    async def limited(self):
+        async with self.limit, process_limit():
+            yield
+
+    async def _limited(self, coro):
+        async with self.limited():
+            return await coro
+
+    async def fetch_article_links(self, keywords: list) -> list:
+        """Same as FactChecker.fetch_article_links, shared by claims with the same keywords."""
+        query = tuple(sorted({keyword.lower() for keyword in keywords}))
+        return await self._shared(
+            self.link_tasks, query, "evidence_rss",
+            lambda: self._limited(self.fact_checker.fetch_article_links(list(query))),
+        )
+
+    async def fetch_article_content(self, links: list) -> list:
+        """Crawls each URL at most once per batch, however many claims link to it."""
+        tasks = [
+            self._shared(
+                self.article_tasks, canonicalize_url(link_obj["link"]), "evidence_crawl",
+                lambda link_obj=link_obj: self._limited(
+                    self.fact_checker.crawl_links(self.crawler, [link_obj], self.crawl_config)
+                ),
+            )
+            for link_obj in links if link_obj.get("link")
+        ]
+        results = await asyncio.gather(*tasks)
+        return [article for articles in results for article in articles]
+
+
 class FactChecker:
-    def __init__(self, groq_client):
+    def __init__(self, groq_client, crawler=None):
         self.groq_client = groq_client
+        # Optional long-lived AsyncWebCrawler, already started and bound to the
+        # event loop this FactChecker runs on. Without it every call opens its own browser.
+        self.crawler = crawler
         self.model_name = "llama-3.1-8b-instant"
         self.crawl_model = "llama-3.1-8b-instant"
 
@@ -37,11 +166,20 @@ class FactChecker:
             return text[start:end+1]
         return text  # Return original text if extraction fails
 
+    async def create_chat_completion(self, stage: str, **kwargs):
+        """Calls Groq's chat completions API in a thread, recording latency and token usage."""
+        with span(f"groq_{stage}"):
+            chat_completion = await asyncio.to_thread(
+                self.groq_client.chat.completions.create, **kwargs
+            )
+        record_token_usage(stage, getattr(chat_completion, "usage", None))
+        return chat_completion
+
     async def refine_context(self, context: str) -> str:
         """Refine the given context and extract keywords using Groq's LLM."""
         try:
-            chat_completion = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
+            chat_completion = await self.create_chat_completion(
+                "refine_context",
                 messages=[{"role": "user", "content": f"""
                     Refine the context: {context}
                     Give me more information about this context.
@@ -57,8 +195,6 @@ class FactChecker:
                 max_tokens=2000  # Reduced to avoid truncation
             )
 
-            print("Raw Groq API Response:", chat_completion)  # Debugging step
-
             if not chat_completion.choices:
                 return json.dumps({"error": "Groq API returned no response"})
 
@@ -77,15 +213,18 @@ class FactChecker:
             return json.dumps({"error": str(e)})
 
     async def fetch_article_links(self, keywords: list) -> list:
-        """Fetch the first 10 article links related to the keywords using Google News RSS."""
+        """
+        Fetch the first 10 distinct article links related to the keywords using Google News RSS.
+        Syndicated copies of the same story (same canonical URL or headline) count once.
+        """
         keywords = [keyword.lower() for keyword in keywords]
         query_str = "+".join(urllib.parse.quote_plus(keyword) for keyword in keywords)
-        rss_url = f"https://news.google.com/rss/search?q={query_str}&hl=en-IN&gl=IN&ceid=IN:en"
+        rss_url = f"{NEWS_RSS_URL}?q={query_str}&hl=en-IN&gl=IN&ceid=IN:en"
 
         feed = await asyncio.to_thread(feedparser.parse, rss_url)
         links = []
 
-        for entry in feed.entries[:10]:
+        for entry in feed.entries:
             link = entry.get("link", "")
             title = entry.get("title", "")
             base_domain = link.split("://")[1].split("/")[0] if "://" in link else ""
@@ -95,39 +234,61 @@ class FactChecker:
                 "title": title,
                 "base_domain": base_domain
             })
-        return links
 
-    async def fetch_article_content(self, links: list, keywords: list) -> list:
-        """Fetch and process article content from the provided links using crawl4ai."""
-        extraction_strategy = LLMExtractionStrategy(
+        distinct, skipped = dedupe_links(links, limit=10)
+        record_duplicates("links", len(distinct) + skipped, len(distinct))
+        return distinct
+
+    def build_crawl_config(self, keywords: list = None) -> CrawlerRunConfig:
+        """Crawler config that extracts the main article text with Groq's LLM."""
+        instruction = "Extract the main article content as plain text."
+        if keywords:
+            instruction += f" Look for mentions of {keywords}."
+        extraction_strategy = MeteredLLMExtractionStrategy(
             provider="groq",
             model_name=self.crawl_model,
             api_token=os.getenv("GROQ_API_KEY"),
+            api_base=f"{GROQ_BASE_URL.rstrip('/')}/openai/v1" if GROQ_BASE_URL else None,
             extraction_type="schema",
             schema={"type": "object", "properties": {"content": {"type": "string"}}},
-            instruction=f"Extract the main article content as plain text. Look for mentions of {keywords}.",
+            instruction=instruction,
             chunk_token_threshold=1200,
             apply_chunking=True,
             extra_args={"temperature": 0.1, "max_tokens": 2000}
         )
+        return CrawlerRunConfig(cache_mode=CacheMode.BYPASS, extraction_strategy=extraction_strategy)
 
-        config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS, extraction_strategy=extraction_strategy)
-        articles = []
+    async def fetch_article_content(self, links: list, keywords: list) -> list:
+        """Fetch and process article content from the provided links using crawl4ai."""
+        config = self.build_crawl_config(keywords)
 
+        if self.crawler is not None:
+            return await self.crawl_links(self.crawler, links, config)
         async with AsyncWebCrawler(config=BrowserConfig(headless=True)) as crawler:
-            for link_obj in links:
-                url = link_obj.get("link", "")
-                if not url:
-                    continue
+            return await self.crawl_links(crawler, links, config)
+
+    async def crawl_links(self, crawler, links: list, config) -> list:
+        """Crawl each link with the given crawler and collect the extracted article content."""
+        articles = []
+        for link_obj in links:
+            url = link_obj.get("link", "")
+            if not url:
+                continue
+            with span("crawl"):
                 result = await crawler.arun(url, config=config)
-                if result.success:
-                    try:
-                        data = json.loads(result.extracted_content)
-                        article_content = data.get("content", "") if isinstance(data, dict) else ""
-                    except Exception as e:
-                        print(f"Failed to parse extracted content for {url}: {e}")
-                        article_content = ""
-                    articles.append({"url": url, "content": article_content})
+            if result.success:
+                try:
+                    data = json.loads(result.extracted_content)
+                    # Schema extraction returns one block per chunk of the page.
+                    blocks = data if isinstance(data, list) else [data]
+                    article_content = "\n".join(
+                        block.get("content", "") for block in blocks
+                        if isinstance(block, dict) and block.get("content")
+                    )
+                except Exception as e:
+                    print(f"Failed to parse extracted content for {url}: {e}")
+                    article_content = ""
+                articles.append({"url": url, "content": article_content})
         return articles
 
     async def verify_fact(self, refined_context: dict, articles: list) -> str:
@@ -144,8 +305,8 @@ class FactChecker:
             }}
         """
         try:
-            verification_response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
+            verification_response = await self.create_chat_completion(
+                "verify_fact",
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model_name,
                 temperature=0.2,
@@ -164,9 +325,17 @@ class FactChecker:
         """Return fact-checking resources."""
         return "FactCheck.org, Snopes, PolitiFact, Reuters Fact Check, AP Fact Check"
 
-    async def fact_check(self, context: str) -> dict:
-        """Orchestrates fact-checking steps."""
-        refined_str = await self.refine_context(context)
+    async def fact_check(self, context: str, evidence: EvidencePool = None) -> dict:
+        """
+        Orchestrates fact-checking steps.
+        Within a batch, `evidence` shares feed and crawl results with the other claims
+        and counts every step against the batch's concurrency budget.
+        """
+        limited = evidence.limited if evidence is not None else contextlib.nullcontext
+
+        with span("refine_context"):
+            async with limited():
+                refined_str = await self.refine_context(context)
         try:
             refined_json = json.loads(refined_str)
         except Exception as e:
@@ -174,9 +343,23 @@ class FactChecker:
             refined_json = {"context": context, "keywords": []}
         keywords = refined_json.get("keywords", [])
 
-        links = await self.fetch_article_links(keywords)
-        articles = await self.fetch_article_content(links, keywords)
-        verification_result = await self.verify_fact(refined_json, articles)
+        with span("fetch_article_links"):
+            if evidence is not None:
+                links = await evidence.fetch_article_links(keywords)
+            else:
+                links = await self.fetch_article_links(keywords)
+        with span("fetch_article_content"):
+            if evidence is not None:
+                articles = await evidence.fetch_article_content(links)
+            else:
+                articles = await self.fetch_article_content(links, keywords)
+        with span("dedupe_articles"):
+            distinct = dedupe_articles(articles)
+            record_duplicates("articles", len(articles), len(distinct))
+            articles = distinct
+        with span("verify_fact"):
+            async with limited():
+                verification_result = await self.verify_fact(refined_json, articles)
         resources = self.get_fact_check_resources()
 
         return {
@@ -186,11 +369,96 @@ class FactChecker:
             "resources": resources
         }
     
+    async def extract_claims(self, transcript: str, max_claims: int = 10, max_concurrency: int = 4) -> list:
+        """
+        Extract check-worthy factual claims from a whole transcript using Groq's LLM.
+        At most MAX_CLAIM_CHUNKS chunks, spread evenly over the transcript, are sent in
+        waves of `max_concurrency`; no further waves start once `max_claims` claims are found.
+        """
+        words = transcript.split()
+        chunks = [" ".join(words[i:i + CLAIM_CHUNK_WORDS]) for i in range(0, len(words), CLAIM_CHUNK_WORDS)]
+        if len(chunks) > MAX_CLAIM_CHUNKS:
+            step = (len(chunks) - 1) / (MAX_CLAIM_CHUNKS - 1)
+            chunks = [chunks[round(i * step)] for i in range(MAX_CLAIM_CHUNKS)]
+
+        async def extract(chunk: str) -> list:
+            try:
+                async with process_limit():
+                    response = await self.create_chat_completion(
+                        "extract_claims",
+                        messages=[{"role": "user", "content": f"""
+                            Extract up to {max_claims} check-worthy factual claims from this transcript: {chunk}
+                            Only include specific, verifiable statements (names, dates, numbers, events).
+                            Rewrite each claim as a short self-contained sentence.
+                            Respond in JSON format:
+                            {{
+                                "claims": ["claim1", "claim2"]
+                            }}
+                        """}],
+                        model=self.model_name,
+                        temperature=0.2,
+                        max_tokens=2000
+                    )
+                if not response.choices:
+                    return []
+                data = json.loads(self.extract_json_from_response(response.choices[0].message.content))
+                return [c for c in data.get("claims", []) if isinstance(c, str) and c.strip()]
+            except Exception as e:
+                print(f"Error extracting claims: {e}")
+                return []
+
+        def merge(per_chunk: list) -> list:
+            # Interleave chunks so the claims cover the whole video, not just its start.
+            claims, seen = [], set()
+            for round_claims in itertools.zip_longest(*per_chunk):
+                for claim in filter(None, round_claims):
+                    key = " ".join(claim.lower().split())
+                    if key not in seen:
+                        seen.add(key)
+                        claims.append(claim.strip())
+            return claims
+
+        # Every wave samples the whole transcript: wave i takes chunks i, i + waves, ...
+        waves = math.ceil(len(chunks) / max_concurrency)
+        per_chunk = []
+        with span("extract_claims"):
+            for wave in range(waves):
+                per_chunk += await asyncio.gather(*(extract(chunk) for chunk in chunks[wave::waves]))
+                if len(merge(per_chunk)) >= max_claims:
+                    break
+        return merge(per_chunk)[:max_claims]
+
+    async def fact_check_batch(self, claims: list, max_concurrency: int = 4) -> list:
+        """
+        Fact-checks several claims concurrently, with at most `max_concurrency`
+        Groq calls, feed fetches and crawls in flight across the whole batch.
+        """
+        if not claims:
+            return []
+
+        async def run(crawler):
+            evidence = EvidencePool(self, crawler, max_concurrency)
+            results = await asyncio.gather(
+                *(self.fact_check(claim, evidence=evidence) for claim in claims),
+                return_exceptions=True
+            )
+            return [
+                {"claim": claim, "error": str(result)} if isinstance(result, Exception)
+                else {"claim": claim, **result}
+                for claim, result in zip(claims, results)
+            ]
+
+        with span("fact_check_batch"):
+            if self.crawler is not None:
+                return await run(self.crawler)
+            async with AsyncWebCrawler(config=BrowserConfig(headless=True)) as crawler:
+                return await run(crawler)
+
     async def summarize_text(self, transcript: str) -> str:
         """Generate a summary of the given transcript using Groq's LLM."""
         try:
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
+            response = await self.create_chat_completion(
+                "summarize_text",
                 messages=[{"role": "user", "content": f"""Summarize this transcript: {transcript}
                     Provide a concise summary of the transcript.
                     Respond in bullet points.
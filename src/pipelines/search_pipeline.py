@@ -1,17 +1,17 @@
 import faiss
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from src.Database.encoder import encode, load_encoder
+
 CSV_FILE = "captions.csv"
 FAISS_INDEX_FILE = "faiss_index.bin"
-EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
 def search_faiss(query, context_window=30):
     """Searches FAISS for relevant captions & fetches context."""
     df = pd.read_csv(CSV_FILE)
-    model = SentenceTransformer(EMBEDDING_MODEL)
-    query_embedding = model.encode([query], convert_to_numpy=True)
+    model = load_encoder()
+    query_embedding = encode(model, query)
 
     index = faiss.read_index(FAISS_INDEX_FILE)
     distances, indices = index.search(query_embedding, 1)
@@ -0,0 +1,64 @@
+"""
+singleflight.py
+----------------
+Request coalescing for expensive, idempotent work such as summaries and fact-checks.
+Concurrent calls with the same key share one in-flight task instead of each
+running the full Groq and crawl pipeline. Nothing is cached after the task finishes.
+"""
+
+import asyncio
+import hashlib
+
+from src.pipelines.metrics import record_cache
+
+
+def normalize_key(text: str) -> str:
+    """Key for an input text that ignores case and whitespace differences."""
+    normalized = " ".join(text.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight work within one event loop.
+
+    The shared task is shielded from its callers: if the caller that started it
+    is cancelled (e.g. the client disconnected), the others still get the result.
+    The task itself is cancelled only when every caller waiting on it is gone.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key: str, coro_factory):
+        """
+        Returns the result of `coro_factory()`, or of the identical call already in flight.
+        `coro_factory` is only invoked when no call with this key is running.
+        """
+        call = self._calls.get(key)
+        record_cache(f"singleflight_{self.name}", call is not None)
+        if call is None:
+            call = _Call(asyncio.ensure_future(coro_factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller went away; stop the work and let the next request start fresh.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
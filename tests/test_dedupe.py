@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.pipelines.dedupe import canonicalize_url, dedupe_articles, dedupe_links, normalize_title
+
+STORY = " ".join(
+    f"The council approved budget line {i} for the new bridge after a long debate." for i in range(20)
+)
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/story?utm_source=rss&utm_medium=feed", "example.com/story"),
+    ("https://example.com/story?gclid=1&fbclid=2&ocid=3&id=7", "example.com/story?id=7"),
+    ("https://example.com/story?ref=home", "example.com/story?ref=home"),
+    ("https://example.com/story?cid=42", "example.com/story?cid=42"),
+    ("https://www.example.com/story/", "example.com/story"),
+    ("https://m.example.com/story", "example.com/story"),
+    ("https://amp.example.com/story", "example.com/story"),
+    ("https://example.com/story/amp", "example.com/story"),
+    ("http://EXAMPLE.com/story#comments", "example.com/story"),
+    ("https://example.com/?b=2&a=1", "example.com/?a=1&b=2"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Bridge Approved - Reuters", "bridge approved"),
+    ("Bridge approved!  - The Daily News", "bridge approved"),
+    ("Café - approval - AP News", "cafe approval"),
+    ("No publisher suffix", "no publisher suffix"),
+])
+def test_normalize_title(title, expected):
+    assert normalize_title(title) == expected
+
+
+def link(url, title):
+    return {"link": url, "title": title}
+
+
+@pytest.mark.parametrize("links, limit, expected_urls, expected_skipped", [
+    # Same canonical URL or same headline from another publisher is a duplicate.
+    (
+        [link("https://a.com/1?utm_source=x", "One - A"), link("https://www.a.com/1", "Other - A"),
+         link("https://b.com/one", "One - B"), link("https://c.com/2", "Two - C")],
+        None,
+        ["https://a.com/1?utm_source=x", "https://c.com/2"],
+        2,
+    ),
+    # Scanning stops at the limit, so later duplicates are not counted.
+    (
+        [link("https://a.com/1", "One - A"), link("https://b.com/1", "One - B"),
+         link("https://c.com/2", "Two - C"), link("https://d.com/2", "Two - D")],
+        2,
+        ["https://a.com/1", "https://c.com/2"],
+        1,
+    ),
+    ([], 10, [], 0),
+])
+def test_dedupe_links(links, limit, expected_urls, expected_skipped):
+    distinct, skipped = dedupe_links(links, limit=limit)
+    assert [l["link"] for l in distinct] == expected_urls
+    assert skipped == expected_skipped
+
+
+@pytest.mark.parametrize("bodies, expected_kept", [
+    # Reformatted copy: same words after normalization.
+    ([STORY, STORY.upper().replace(".", " .")], [0]),
+    # Syndicated copy with a different last sentence.
+    ([STORY, STORY + " Reporting by a wire partner."], [0]),
+    # Unrelated articles are all kept.
+    ([STORY, "A completely different report about the football season and its surprising winners."], [0, 1]),
+    # Empty bodies are never treated as duplicates.
+    (["", "", STORY], [0, 1, 2]),
+])
+def test_dedupe_articles(bodies, expected_kept):
+    articles = [{"url": f"https://site{i}.com", "content": body} for i, body in enumerate(bodies)]
+    assert dedupe_articles(articles) == [articles[i] for i in expected_kept]
+
+
+def test_dedupe_articles_threshold():
+    articles = [{"content": STORY}, {"content": STORY + " Reporting by a wire partner."}]
+    # Near-duplicates fall below an exact-match threshold.
+    assert dedupe_articles(articles, threshold=1.0) == articles
+    assert dedupe_articles(articles, threshold=0.8) == articles[:1]
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from src.pipelines.singleflight import SingleFlight, normalize_key
+
+
+class Work:
+    """A coroutine factory that counts its runs and finishes when released."""
+
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_normalize_key_ignores_case_and_whitespace():
+    assert normalize_key("Hello   World\n") == normalize_key("hello world")
+    assert normalize_key("hello world") != normalize_key("hello there")
+
+
+def test_concurrent_callers_share_one_result():
+    async def scenario():
+        flight = SingleFlight("test")
+        work = Work()
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        assert await asyncio.gather(*callers) == ["done"] * 3
+        assert work.runs == 1
+        assert flight._calls == {}
+
+    asyncio.run(scenario())
+
+
+def test_first_caller_cancelled_others_still_get_result():
+    async def scenario():
+        flight = SingleFlight("test")
+        work = Work()
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        work.release.set()
+        assert await second == "done"
+        assert work.runs == 1 and not work.cancelled
+
+    asyncio.run(scenario())
+
+
+def test_last_waiter_cancelled_cancels_task_and_frees_key():
+    async def scenario():
+        flight = SingleFlight("test")
+        work = Work()
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for caller in callers:
+            caller.cancel()
+        for caller in callers:
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+        await asyncio.sleep(0)
+        assert work.cancelled
+        assert "key" not in flight._calls
+
+        # The next call starts fresh instead of joining the cancelled task.
+        fresh = Work("again")
+        fresh.release.set()
+        assert await flight.do("key", fresh) == "again"
+        assert fresh.runs == 1
+
+    asyncio.run(scenario())
+
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flight = SingleFlight("test")
+        work = Work(error=ValueError("boom"))
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+        assert work.runs == 1
+        assert flight._calls == {}
+
+    asyncio.run(scenario())
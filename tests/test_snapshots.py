@@ -0,0 +1,78 @@
+import os
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+faiss = pytest.importorskip("faiss")
+
+from src.Database import snapshots
+
+
+def make_index(rows: int):
+    embeddings = np.random.rand(rows, 8).astype("float32")
+    index = faiss.IndexFlatL2(8)
+    index.add(embeddings)
+    df = pd.DataFrame({"Timestamp": ["00:00:01"] * rows, "Caption": [f"caption {i}" for i in range(rows)]})
+    return index, df
+
+
+def test_publish_and_swap(tmp_path):
+    snapshot_dir = str(tmp_path)
+    first = snapshots.publish_snapshot(*make_index(5), snapshot_dir=snapshot_dir)
+    reader = snapshots.SnapshotReader(snapshot_dir)
+    held = reader.get()
+    assert held.version == first and held.index.ntotal == 5
+
+    second = snapshots.publish_snapshot(*make_index(7), snapshot_dir=snapshot_dir)
+    assert reader.get().version == second
+    # The first version is still held, so it survives garbage collection.
+    assert os.path.isdir(os.path.join(snapshot_dir, first))
+    assert held.index.ntotal == 5
+
+    del held
+    assert first in snapshots.collect_garbage(snapshot_dir)
+    assert sorted(os.listdir(snapshot_dir)) == sorted([second, snapshots.CURRENT_FILE])
+
+
+def test_concurrent_publish_and_collect_keeps_current(tmp_path):
+    snapshot_dir = str(tmp_path)
+    snapshots.publish_snapshot(*make_index(3), snapshot_dir=snapshot_dir)
+    stop = threading.Event()
+    errors = []
+
+    def publisher():
+        try:
+            for _ in range(40):
+                snapshots.publish_snapshot(*make_index(3), snapshot_dir=snapshot_dir)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    def collector():
+        while not stop.is_set():
+            try:
+                snapshots.collect_garbage(snapshot_dir)
+            except Exception as e:
+                errors.append(e)
+
+    def reader():
+        snapshot_reader = snapshots.SnapshotReader(snapshot_dir)
+        while not stop.is_set():
+            try:
+                snapshot_reader.get()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=fn) for fn in (publisher, collector, collector, reader)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    current = snapshots.read_current_version(snapshot_dir)
+    assert os.path.isdir(os.path.join(snapshot_dir, current))
+    assert snapshots.SnapshotReader(snapshot_dir).get().version == current